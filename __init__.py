@@ -3,15 +3,24 @@ import json
 import logging
 import shutil
 import subprocess
-import tempfile
-from typing import List, Dict, Any
+import secrets
+from typing import List, Dict, Any, Tuple, Union, Set, BinaryIO, Optional
 from pathlib import Path
-from aiohttp import web
+from aiohttp import web, BodyPartReader
 import server
+try:
+    import orjson
+except ImportError:
+    orjson = None
 import sys
 import stat
 import mimetypes
-import re
+import string
+import pickle
+import asyncio
+import hashlib
+from email.utils import formatdate
+from concurrent.futures import ThreadPoolExecutor, Future
 
 mimetypes.add_type('application/javascript', '.js')
 
@@ -20,16 +29,25 @@ FLOWS_PATH = WEBROOT / "flows"
 CORE_PATH = WEBROOT / "core"
 FLOWER_PATH = WEBROOT / "flower"
 LINKER_PATH = WEBROOT / "linker"
+FLOW_CACHE_PATH = WEBROOT / ".flow_cache.pkl"
+FLOWS_REPO_PATH = WEBROOT / ".flows_repo"
 
 FLOW_PATH = WEBROOT / "flow"
 CUSTOM_THEMES_DIR = WEBROOT / 'custom-themes'
 CUSTOM_NODES_DIR = Path(__file__).parent.parent
 EXTENSION_NODE_MAP_PATH = Path(__file__).parent.parent / "ComfyUI-Manager" / "extension-node-map.json"
 
+# String forms for per-request lookups, os.path.join is much cheaper than building a Path
+FLOWS_PATH_STR = str(FLOWS_PATH)
+CUSTOM_NODES_DIR_STR = str(CUSTOM_NODES_DIR)
+CUSTOM_THEMES_DIR_STR = str(CUSTOM_THEMES_DIR)
+EXTENSION_NODE_MAP_PATH_STR = str(EXTENSION_NODE_MAP_PATH)
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 AppConfig = Dict[str, Any]
+ConfigCacheKey = Tuple[str, int, int]
 Routes = web.RouteTableDef
 FLOWS_DOWNLOAD_PATH = 'https://github.com/diStyApps/flows_lib'
 NODE_CLASS_MAPPINGS: Dict[str, Any] = {}
@@ -41,91 +59,239 @@ PURPLE = "\033[38;5;129m"
 RESET = "\033[0m"
 FLOWMSG = f"{PURPLE}Flow{RESET}"
 ALLOWED_EXTENSIONS = {'css'}
-SAFE_FOLDER_NAME_REGEX = re.compile(r'^[\w\-]+$')
+_ALLOWED_SUFFIXES = tuple('.' + ext for ext in ALLOWED_EXTENSIONS)
+SAFE_FOLDER_NAME_CHARS = frozenset(string.ascii_letters + string.digits + '_-')
+MAX_FLOW_UPLOAD_SIZE = 100 * 1024 * 1024
+UPLOAD_CHUNK_SIZE = 64 * 1024
+INLINE_JSON_PARSE_LIMIT = 64 * 1024
+_COPY_SKIP_NAMES = frozenset({'.git', '.github'})
+_FLOWS_READY = asyncio.Event()
+_ENM_CACHE: Dict[str, Any] = {'key': None, 'body': None, 'etag': None, 'last_modified': None}
+_NODES_CACHE: Dict[str, Any] = {'mtime_ns': -1, 'body': b'{"installedNodes":[]}'}
+_THEMES_CACHE: Dict[str, Any] = {'mtime_ns': -1, 'body': b'[]'}
+
+def _readahead(path: Path) -> None:
+    # Ask the kernel to start pulling the file into the page cache; a no-op where unsupported
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def _json_loads(data: Union[bytes, str]) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+async def _json_loads_async(data: bytes) -> Any:
+    # Small documents parse faster than an executor round trip, large ones would stall the loop
+    if len(data) < INLINE_JSON_PARSE_LIMIT:
+        return _json_loads(data)
+    return await asyncio.get_running_loop().run_in_executor(None, _json_loads, data)
+
+def _json_dumps(obj: Any, indent: bool = False) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None).encode('utf-8')
+
+_VERSION_BODY: bytes = _json_dumps({'version': APP_VERSION})
+_APPS_BODY: bytes = b'[]'
+_APPS_ETAG: str = ''
 
 class RouteManager:
     @staticmethod
-    def create_routes(base_path: str, app_dir: Path) -> Routes:
-        routes = web.RouteTableDef()
+    def add_routes_into(routes: Routes, base_path: str, app_dir: Path) -> None:
         index_html = app_dir / 'index.html'
 
         @routes.get(f"/{base_path}")
         async def serve_html(request: web.Request) -> web.FileResponse:
             return web.FileResponse(index_html)
 
+        routes.static(f"/{base_path}/", path=app_dir, show_index=True)
+
+    @staticmethod
+    def add_shared_static_routes_into(routes: Routes, app_dir: Path, mounted: Set[str]) -> None:
+        # Static resources match on prefix alone, so only the first '/css/' etc. ever serves;
+        # mount each prefix once instead of once per flow.
         for static_dir in ['css', 'js', 'media']:
+            if static_dir in mounted:
+                continue
             static_path = app_dir / static_dir
             if static_path.is_dir():
                 routes.static(f"/{static_dir}/", path=static_path)
-
-        routes.static(f"/{base_path}/", path=app_dir, show_index=True)
-        return routes
+                mounted.add(static_dir)
 
 class AppManager:
     @staticmethod
-    def setup_app_routes(app: web.Application) -> None:
+    def scan_flows() -> List[Tuple[Path, AppConfig]]:
+        config_cache = AppManager._load_config_cache()
+        updated_cache: Dict[ConfigCacheKey, AppConfig] = {}
         try:
-            for item in FLOWS_PATH.iterdir():
-                if item.is_dir():
-                    conf_file = item / 'flowConfig.json'
-                    if conf_file.is_file():
-                        try:
-                            conf = AppManager._load_config(conf_file)
-                            url = conf.get('url', '')
-                            flow_url_path = "flow/" + url
-                            routes = RouteManager.create_routes(flow_url_path, item)
-                            app.add_routes(routes)
-                            APP_CONFIGS.append(conf)
-                        except Exception as e:
-                            logger.error(f"{FLOWMSG}: Error setting up routes for {item}: {e}")
-                    else:
-                        # logger.warning(f"{FLOWMSG}: No conf.json found in {item}, skipping.")
-                        pass
-                else:
-                    # logger.debug(f"{FLOWMSG}: {item} is not a directory, skipping.")
-                    pass
+            with os.scandir(FLOWS_PATH) as it:
+                entries = [entry for entry in it if entry.is_dir()]
         except Exception as e:
             logger.error(f"{FLOWMSG}: Failed to iterate over flows directory: {e}")
+            entries = []
+
+        candidates: List[Tuple[Path, ConfigCacheKey, Path]] = []
+        for entry in entries:
+            st = _stat_regular_file(os.path.join(entry.path, 'flowConfig.json'))
+            if st is None:
+                continue
+            # Keyed on the config file itself, in-place saves don't touch the directory mtime
+            item = Path(entry.path)
+            candidates.append((item, (entry.name, st.st_mtime_ns, st.st_size), item / 'flowConfig.json'))
+
+        pending: Dict[ConfigCacheKey, Future] = {}
+        misses = [(key, conf_file) for _, key, conf_file in candidates if key not in config_cache]
+        if misses:
+            for _, conf_file in misses:
+                _readahead(conf_file)
+            with ThreadPoolExecutor(max_workers=min(32, len(misses))) as pool:
+                for key, conf_file in misses:
+                    pending[key] = pool.submit(AppManager._load_config, conf_file)
+
+        flows: List[Tuple[Path, AppConfig]] = []
+        for item, key, _ in candidates:
+            try:
+                conf = pending[key].result() if key in pending else config_cache[key]
+            except Exception as e:
+                logger.error(f"{FLOWMSG}: Error loading config for {item}: {e}")
+                continue
+            updated_cache[key] = conf
+            flows.append((item, conf))
 
-        if CORE_PATH.is_dir():
-            # Add the specific handlers before the general static route
-            app.router.add_get('/core/css/themes/list', list_themes_handler)
-            app.router.add_get('/core/css/themes/{filename}', get_theme_css_handler)
-            app.router.add_static('/core/', path=CORE_PATH, name='core')
+        if updated_cache != config_cache:
+            AppManager._save_config_cache(updated_cache)
+        return flows
 
-        if FLOWER_PATH.is_dir():
-            flow_builder_routes = RouteManager.create_routes('flow/flower', FLOWER_PATH)
-            app.add_routes(flow_builder_routes)
+    @staticmethod
+    def setup_app_routes(app: web.Application, flows: List[Tuple[Path, AppConfig]]) -> None:
+        # Must run on the event loop thread, the aiohttp router is not thread-safe.
+        # All flows go into one table so the router is updated in a single add_routes call.
+        routes = web.RouteTableDef()
+        mounted_static: Set[str] = set()
+        builtin_apps = [(base_path, app_dir) for base_path, app_dir in
+                        [('flow/flower', FLOWER_PATH), ('flow/linker', LINKER_PATH), ('flow', FLOW_PATH)]
+                        if app_dir.is_dir()]
+        # Checked up front, since any path aiohttp rejects would fail add_routes for the whole table
+        registered_paths = {base_path for base_path, _ in builtin_apps}
+        flow_configs: List[AppConfig] = []
+
+        for item, conf in flows:
+            try:
+                url = conf.get('url', '')
+                if not is_valid_flow_url(url):
+                    raise ValueError(f"invalid url {url!r}")
+                flow_url_path = "flow/" + url
+                if flow_url_path in registered_paths:
+                    raise ValueError(f"url '{url}' is already in use")
+                RouteManager.add_routes_into(routes, flow_url_path, item)
+                RouteManager.add_shared_static_routes_into(routes, item, mounted_static)
+                registered_paths.add(flow_url_path)
+                flow_configs.append(conf)
+            except Exception as e:
+                logger.error(f"{FLOWMSG}: Error setting up routes for {item}: {e}")
 
-        if LINKER_PATH.is_dir():
-            flow_builder_routes = RouteManager.create_routes('flow/linker', LINKER_PATH)
-            app.add_routes(flow_builder_routes)
+        try:
+            app.add_routes(routes)
+            APP_CONFIGS.extend(flow_configs)
+        except Exception as e:
+            logger.error(f"{FLOWMSG}: Failed to add flow routes: {e}")
+        _rebuild_apps_body()
 
-        if FLOW_PATH.is_dir():
-            flow_routes = RouteManager.create_routes('flow', FLOW_PATH)
-            app.add_routes(flow_routes)
+        # Registered separately so a flow failure can't take the builtin apps down with it
+        builtin_routes = web.RouteTableDef()
+        for base_path, app_dir in builtin_apps:
+            RouteManager.add_routes_into(builtin_routes, base_path, app_dir)
+            RouteManager.add_shared_static_routes_into(builtin_routes, app_dir, mounted_static)
+        app.add_routes(builtin_routes)
 
+    @staticmethod
+    def _load_config(conf_file: Path) -> Dict[str, Any]:
+        with conf_file.open('rb') as f:
+            return _json_loads(f.read())
 
+    @staticmethod
+    def _load_config_cache() -> Dict[ConfigCacheKey, AppConfig]:
+        try:
+            with FLOW_CACHE_PATH.open('rb') as f:
+                cache = pickle.load(f)
+            return cache if isinstance(cache, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"{FLOWMSG}: Ignoring unreadable flow cache {FLOW_CACHE_PATH}: {e}")
+            return {}
 
     @staticmethod
-    def _load_config(conf_file: Path) -> Dict[str, Any]:
-        with conf_file.open('r') as f:
-            return json.load(f)
+    def _save_config_cache(cache: Dict[ConfigCacheKey, AppConfig]) -> None:
+        try:
+            with FLOW_CACHE_PATH.open('wb') as f:
+                pickle.dump(cache, f, protocol=5)
+        except Exception as e:
+            logger.warning(f"{FLOWMSG}: Failed to write flow cache {FLOW_CACHE_PATH}: {e}")
+
+def _rebuild_apps_body() -> None:
+    # Call whenever APP_CONFIGS changes
+    global _APPS_BODY, _APPS_ETAG
+    _APPS_BODY = _json_dumps(APP_CONFIGS)
+    _APPS_ETAG = f'"{hashlib.blake2b(_APPS_BODY, digest_size=8).hexdigest()}"'
 
 async def apps_handler(request: web.Request) -> web.Response:
-    return web.json_response(APP_CONFIGS)
+    await _FLOWS_READY.wait()
+    if request.headers.get('If-None-Match') == _APPS_ETAG:
+        return web.Response(status=304, headers={'ETag': _APPS_ETAG})
+    return web.Response(body=_APPS_BODY, headers={'ETag': _APPS_ETAG}, content_type='application/json')
 
 async def app_version_handler(request: web.Request) -> web.Response:
-    return web.json_response({'version': APP_VERSION})
+    return web.Response(body=_VERSION_BODY, content_type='application/json')
+
+def _load_extension_node_map() -> None:
+    with open(EXTENSION_NODE_MAP_PATH_STR, 'rb') as f:
+        st = os.fstat(f.fileno())
+        key = (st.st_mtime_ns, st.st_size)
+        if _ENM_CACHE['key'] == key:
+            return
+        body = f.read()
+    _ENM_CACHE.update(
+        key=key,
+        body=body,
+        etag=f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"',
+        last_modified=formatdate(st.st_mtime, usegmt=True),
+    )
 
 async def extension_node_map_handler(request: web.Request) -> web.Response:
-    if EXTENSION_NODE_MAP_PATH.exists():
-        with EXTENSION_NODE_MAP_PATH.open('r') as f:
-            extension_node_map = json.load(f)
-        return web.json_response(extension_node_map)
-    else:
+    loop = asyncio.get_running_loop()
+    try:
+        st = await loop.run_in_executor(None, os.stat, EXTENSION_NODE_MAP_PATH_STR)
+        if _ENM_CACHE['key'] != (st.st_mtime_ns, st.st_size):
+            await loop.run_in_executor(None, _load_extension_node_map)
+    except FileNotFoundError:
         return web.Response(status=404, text="extension-node-map.json not found")
 
+    headers = {
+        'ETag': _ENM_CACHE['etag'],
+        'Last-Modified': _ENM_CACHE['last_modified'],
+        'Cache-Control': 'public, max-age=60',
+    }
+    if request.headers.get('If-None-Match') == _ENM_CACHE['etag']:
+        return web.Response(status=304, headers=headers)
+    return web.Response(body=_ENM_CACHE['body'], headers=headers, content_type='application/json')
+
+async def _run_process(*args: str) -> subprocess.CompletedProcess:
+    proc = await asyncio.create_subprocess_exec(*args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+    stdout, stderr = await proc.communicate()
+    return subprocess.CompletedProcess(list(args), proc.returncode,
+                                       stdout.decode(errors='replace'), stderr.decode(errors='replace'))
+
 async def install_package_handler(request: web.Request) -> web.Response:
     data = await request.json()
     package_url = data.get('packageUrl')
@@ -133,22 +299,22 @@ async def install_package_handler(request: web.Request) -> web.Response:
         return web.Response(status=400, text="Missing 'packageUrl' in request body")
     
     package_name = package_url.rstrip('/').split('/')[-1]
-    install_path = CUSTOM_NODES_DIR / package_name
+    install_path = os.path.join(CUSTOM_NODES_DIR_STR, package_name)
 
-    if install_path.exists():
+    if os.path.lexists(install_path):
         return web.json_response({'status': 'already_installed', 'message': f"Custom node '{package_name}' is already installed."})
 
     try:
-        subprocess.check_call(['git', 'clone', package_url, str(install_path)])
+        (await _run_process('git', 'clone', package_url, install_path)).check_returncode()
         logger.info(f"{FLOWMSG}: Custom node '{package_name}' cloned successfully.")
-        requirements_file = install_path / 'requirements.txt'
-        if requirements_file.exists():
+        requirements_file = os.path.join(install_path, 'requirements.txt')
+        if os.path.exists(requirements_file):
             try:
-                subprocess.check_call([sys.executable, '-m', 'pip', 'install', '-r', str(requirements_file)])
+                (await _run_process(sys.executable, '-m', 'pip', 'install', '-r', requirements_file)).check_returncode()
                 logger.info(f"{FLOWMSG}: Requirements for '{package_name}' installed successfully.")
             except subprocess.CalledProcessError as e:
-                logger.error(f"{FLOWMSG}: Failed to install requirements for '{package_name}': {e}")
-                shutil.rmtree(install_path)
+                logger.error(f"{FLOWMSG}: Failed to install requirements for '{package_name}': {e}\n{e.stderr}")
+                await _remove_tree(install_path)
                 return web.json_response({
                     'status': 'error',
                     'message': f"{FLOWMSG}: Failed to install requirements for '{package_name}'. The package has been removed. Please try installing manually."
@@ -158,13 +324,13 @@ async def install_package_handler(request: web.Request) -> web.Response:
        
         return web.json_response({'status': 'success', 'message': f"Custom node '{package_name}' installed successfully."})
     except subprocess.CalledProcessError as e:
-        if install_path.exists():
-            shutil.rmtree(install_path)
-        logger.error(f"{FLOWMSG}: Failed to install package '{package_name}': {e}")
+        if os.path.lexists(install_path):
+            await _remove_tree(install_path)
+        logger.error(f"{FLOWMSG}: Failed to install package '{package_name}': {e}\n{e.stderr}")
         return web.json_response({'status': 'error', 'message': f"Failed to install custom node '{package_name}': {e}"}, status=500)
     except Exception as e:
-        if install_path.exists():
-            shutil.rmtree(install_path)
+        if os.path.lexists(install_path):
+            await _remove_tree(install_path)
         logger.error(f"{FLOWMSG}: An unexpected error occurred while installing '{package_name}': {e}")
         return web.json_response({'status': 'error', 'message': f"An unexpected error occurred while installing '{package_name}': {e}"}, status=500)
 
@@ -175,13 +341,13 @@ async def update_package_handler(request: web.Request) -> web.Response:
         return web.Response(status=400, text="Missing 'packageUrl' in request body")
     
     package_name = package_url.rstrip('/').split('/')[-1]
-    install_path = CUSTOM_NODES_DIR / package_name
+    install_path = os.path.join(CUSTOM_NODES_DIR_STR, package_name)
 
-    if not install_path.exists():
+    if not os.path.exists(install_path):
         return web.json_response({'status': 'not_installed', 'message': f"Package '{package_name}' is not installed."})
 
     try:
-        result = subprocess.run(['git', '-C', str(install_path), 'pull'], capture_output=True, text=True)
+        result = await _run_process('git', '-C', install_path, 'pull')
         if result.returncode == 0:
             return web.json_response({'status': 'success', 'message': f"Package '{package_name}' updated successfully."})
         else:
@@ -195,6 +361,19 @@ def remove_readonly(func, path, excinfo):
     os.chmod(path, stat.S_IWRITE)
     func(path)
 
+def _rmtree_writable(path: str) -> None:
+    # Clear read-only bits up front (git objects on Windows) instead of retrying per file in onerror
+    for root, dirs, files in os.walk(path):
+        for name in files:
+            os.chmod(os.path.join(root, name), stat.S_IWRITE)
+    shutil.rmtree(path, onerror=remove_readonly)
+
+async def _remove_tree(path: str) -> None:
+    if os.name == 'nt':
+        await asyncio.get_running_loop().run_in_executor(None, _rmtree_writable, path)
+    else:
+        (await _run_process('rm', '-rf', '--', path)).check_returncode()
+
 async def uninstall_package_handler(request: web.Request) -> web.Response:
     data = await request.json()
     package_url = data.get('packageUrl')
@@ -203,16 +382,16 @@ async def uninstall_package_handler(request: web.Request) -> web.Response:
         return web.Response(status=400, text="Missing 'packageUrl' in request body")
     
     package_name = package_url.rstrip('/').split('/')[-1]
-    install_path = CUSTOM_NODES_DIR / package_name
+    install_path = os.path.join(CUSTOM_NODES_DIR_STR, package_name)
 
-    if not install_path.exists():
+    if not os.path.lexists(install_path):
         logger.info(f"{FLOWMSG}: Attempt to uninstall non-existent package '{package_name}'.")
         return web.json_response({'status': 'not_installed', 'message': f"Custom node '{package_name}' is not installed."})
 
     try:
         logger.info(f"{FLOWMSG}: Uninstalling custom node '{package_name}'...")
 
-        shutil.rmtree(install_path, onerror=remove_readonly)
+        await _remove_tree(install_path)
         logger.info(f"{FLOWMSG}: Custom node '{package_name}' uninstalled successfully.")
 
         return web.json_response({'status': 'success', 'message': f"Custom node '{package_name}' uninstalled successfully."})
@@ -220,18 +399,33 @@ async def uninstall_package_handler(request: web.Request) -> web.Response:
         logger.error(f"{FLOWMSG}: An error occurred while uninstalling '{package_name}': {e}")
         return web.json_response({'status': 'error', 'message': f"An error occurred while uninstalling custom node '{package_name}': {e}"}, status=500)
 
+def _list_installed_nodes() -> bytes:
+    # Symlinked node folders (common for development checkouts) still count as installed
+    with os.scandir(CUSTOM_NODES_DIR_STR) as it:
+        installed_nodes = [entry.name for entry in it if entry.is_dir()]
+    return _json_dumps({'installedNodes': installed_nodes})
+
 async def installed_custom_nodes_handler(request: web.Request) -> web.Response:
     try:
-        installed_nodes = []
-        if CUSTOM_NODES_DIR.exists():
-            for item in CUSTOM_NODES_DIR.iterdir():
-                if item.is_dir():
-                    installed_nodes.append(item.name)
-        return web.json_response({'installedNodes': installed_nodes})
+        try:
+            mtime_ns = os.stat(CUSTOM_NODES_DIR_STR).st_mtime_ns
+        except FileNotFoundError:
+            return web.Response(body=_json_dumps({'installedNodes': []}), content_type='application/json')
+        # Installing or removing a node adds or unlinks a child entry, which bumps the directory mtime
+        if _NODES_CACHE['mtime_ns'] != mtime_ns:
+            body = await asyncio.get_running_loop().run_in_executor(None, _list_installed_nodes)
+            _NODES_CACHE.update(mtime_ns=mtime_ns, body=body)
+        return web.Response(body=_NODES_CACHE['body'], content_type='application/json')
     except Exception as e:
         logger.error(f"{FLOWMSG}: Error fetching installed custom nodes: {e}")
         return web.Response(status=500, text="Internal Server Error")
 
+def _write_file(path: Union[str, Path], data: bytes) -> None:
+    with open(path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
 async def save_config_handler(request: web.Request) -> web.Response:
     try:
         data = await request.json()
@@ -239,13 +433,13 @@ async def save_config_handler(request: web.Request) -> web.Response:
         if not flow_id:
             return web.Response(status=400, text="Missing 'id' in request body")
 
-        flow_path = FLOWS_PATH / flow_id
-        if not flow_path.exists():
+        flow_path = os.path.join(FLOWS_PATH_STR, flow_id)
+        if not os.path.exists(flow_path):
             return web.Response(status=404, text=f"Flow directory '{flow_id}' not found")
 
-        config_path = flow_path / 'flowConfig.json'
-        with config_path.open('w') as f:
-            json.dump(data, f, indent=2)
+        config_path = os.path.join(flow_path, 'flowConfig.json')
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, _write_file, config_path, _json_dumps(data, indent=True))
 
         return web.json_response({'status': 'success', 'message': f"Configuration for flow '{flow_id}' saved successfully."})
     except Exception as e:
@@ -253,11 +447,46 @@ async def save_config_handler(request: web.Request) -> web.Response:
         return web.Response(status=500, text=f"{FLOWMSG}: Error saving configuration: {str(e)}")
 
 
+def is_valid_flow_url(url: Any) -> bool:
+    # Braces would turn the path into an aiohttp dynamic resource, or make it invalid
+    return isinstance(url, str) and bool(url) and '{' not in url and '}' not in url
+
+def is_safe_folder_name(name: Any) -> bool:
+    return isinstance(name, str) and bool(name) and SAFE_FOLDER_NAME_CHARS.issuperset(name)
+
+def _finish_upload(f: BinaryIO) -> None:
+    try:
+        f.flush()
+        os.fsync(f.fileno())
+    finally:
+        f.close()
+
+async def _stream_part_to_file(part: BodyPartReader, path: Path, limit: int) -> int:
+    loop = asyncio.get_running_loop()
+    f = await loop.run_in_executor(None, path.open, 'wb')
+    size = 0
+    try:
+        while True:
+            chunk = await part.read_chunk(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > limit:
+                raise web.HTTPRequestEntityTooLarge(max_size=limit, actual_size=size)
+            await loop.run_in_executor(None, f.write, chunk)
+    finally:
+        await loop.run_in_executor(None, _finish_upload, f)
+    return size
+
 async def create_flow_handler(request: web.Request) -> web.Response:
+    if request.content_length is not None and request.content_length > MAX_FLOW_UPLOAD_SIZE:
+        return web.Response(status=413, text=f"Request body exceeds {MAX_FLOW_UPLOAD_SIZE} bytes")
+
+    wf_tmp_path = None
     try:
         reader = await request.multipart()
         flow_config = None
-        wf_file = None
+        wf_size = 0
         flow_url = None
 
         while True:
@@ -267,21 +496,24 @@ async def create_flow_handler(request: web.Request) -> web.Response:
 
             if part.name == 'flowConfig':
                 flow_config_content = await part.read(decode=True)
-                flow_config = json.loads(flow_config_content)
+                flow_config = await _json_loads_async(flow_config_content)
                 flow_url = flow_config.get('url', None)
                 if not flow_url:
                     return web.Response(status=400, text="Missing 'url' in 'flowConfig'")
             elif part.name == 'wf':
-                wf_file_content = await part.read(decode=True)
-                wf_file = wf_file_content
+                # The part may arrive before 'flowConfig', so stream it next to the flows and move it in place later
+                if wf_tmp_path is None:
+                    FLOWS_PATH.mkdir(parents=True, exist_ok=True)
+                    wf_tmp_path = FLOWS_PATH / f".wf-{secrets.token_hex(8)}.part"
+                wf_size = await _stream_part_to_file(part, wf_tmp_path, MAX_FLOW_UPLOAD_SIZE)
             else:
                 pass  # Handle other parts if necessary
 
-        if not flow_config or not wf_file:
+        if not flow_config or not wf_size:
             return web.Response(status=400, text="Missing 'flowConfig' or 'wf' in request")
 
         # Validate flow_url to prevent directory traversal and ensure it's a safe folder name
-        if not SAFE_FOLDER_NAME_REGEX.match(flow_url):
+        if not is_safe_folder_name(flow_url):
             return web.Response(status=400, text="Invalid 'url' in 'flowConfig'. Only letters, numbers, dashes, and underscores are allowed.")
 
         # Create the flow directory
@@ -290,30 +522,38 @@ async def create_flow_handler(request: web.Request) -> web.Response:
             return web.Response(status=400, text=f"Flow with url '{flow_url}' already exists")
 
         flow_folder.mkdir(parents=True, exist_ok=False)
+        loop = asyncio.get_running_loop()
 
         # Save 'flowConfig.json'
         flow_config_path = flow_folder / 'flowConfig.json'
-        with flow_config_path.open('w') as f:
-            json.dump(flow_config, f, indent=2)
+        await loop.run_in_executor(None, _write_file, flow_config_path, _json_dumps(flow_config, indent=True))
 
         # Save 'wf.json'
         wf_json_path = flow_folder / 'wf.json'
-        with wf_json_path.open('wb') as f:
-            f.write(wf_file)
+        os.replace(wf_tmp_path, wf_json_path)
+        wf_tmp_path = None
 
         # Copy 'index.html' from core/templates
         index_template_path = CORE_PATH / 'templates' / 'index.html'
         if not index_template_path.exists():
             return web.Response(status=500, text="Template 'index.html' not found")
         index_destination_path = flow_folder / 'index.html'
-        shutil.copy2(index_template_path, index_destination_path)
+        await loop.run_in_executor(None, shutil.copy2, index_template_path, index_destination_path)
 
         logger.info(f"{FLOWMSG}: Flow '{flow_url}' created successfully.")
         return web.json_response({'status': 'success', 'message': f"Flow '{flow_url}' created successfully."})
 
+    except web.HTTPException:
+        raise
     except Exception as e:
         logger.error(f"{FLOWMSG}: Error creating flow: {e}")
         return web.Response(status=500, text=f"{FLOWMSG}: Error creating flow: {str(e)}")
+    finally:
+        if wf_tmp_path is not None:
+            try:
+                wf_tmp_path.unlink()
+            except OSError:
+                pass
 
 
 
@@ -325,22 +565,39 @@ if not CUSTOM_THEMES_DIR.exists():
         logger.error(f"Failed to create custom-themes directory: {e}")
 
 def allowed_file(filename: str) -> bool:
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    return filename.lower().endswith(_ALLOWED_SUFFIXES)
+
+def _list_themes() -> bytes:
+    with os.scandir(CUSTOM_THEMES_DIR_STR) as it:
+        css_files = [entry.name for entry in it if entry.is_file() and allowed_file(entry.name)]
+    return _json_dumps(css_files)
 
 async def list_themes_handler(request: web.Request) -> web.Response:
-    themes_dir = CUSTOM_THEMES_DIR  
+    themes_dir = CUSTOM_THEMES_DIR_STR  
+    loop = asyncio.get_running_loop()
     try:
-        if not themes_dir.exists():
+        try:
+            mtime_ns = (await loop.run_in_executor(None, os.stat, themes_dir)).st_mtime_ns
+        except FileNotFoundError:
             logger.warning(f"Custom themes directory does not exist: {themes_dir}")
             return web.json_response([], status=200)
         
-        css_files = [file.name for file in themes_dir.iterdir() if file.is_file() and allowed_file(file.name)]
-        return web.json_response(css_files)
+        if _THEMES_CACHE['mtime_ns'] != mtime_ns:
+            body = await loop.run_in_executor(None, _list_themes)
+            _THEMES_CACHE.update(mtime_ns=mtime_ns, body=body)
+        return web.Response(body=_THEMES_CACHE['body'], content_type='application/json')
     
     except Exception as e:
         logger.error(f"Error listing theme files: {e}")
         return web.json_response({'error': 'Failed to list theme files.'}, status=500)
 
+def _stat_regular_file(path: str) -> Optional[os.stat_result]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st if stat.S_ISREG(st.st_mode) else None
+
 async def get_theme_css_handler(request: web.Request) -> web.Response:
     filename = request.match_info.get('filename')
     
@@ -348,10 +605,11 @@ async def get_theme_css_handler(request: web.Request) -> web.Response:
         logger.warning(f"Attempt to access disallowed file type: {filename}")
         raise web.HTTPNotFound()
     
-    themes_dir = CUSTOM_THEMES_DIR 
-    file_path = themes_dir / filename
+    themes_dir = CUSTOM_THEMES_DIR_STR 
+    file_path = os.path.join(themes_dir, filename)
     
-    if not file_path.exists() or not file_path.is_file():
+    st = await asyncio.get_running_loop().run_in_executor(None, _stat_regular_file, file_path)
+    if st is None:
         logger.warning(f"CSS file not found: {file_path}")
         raise web.HTTPNotFound()
     
@@ -361,82 +619,161 @@ async def get_theme_css_handler(request: web.Request) -> web.Response:
         logger.error(f"Error serving CSS file '{filename}': {e}")
         raise web.HTTPInternalServerError(text="Internal Server Error")
 
+def _run_git(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(['git', '-c', 'core.fsmonitor=false', *args],
+                          capture_output=True, text=True)
+
 def download_or_update_flows() -> None:
     try:
-        with tempfile.TemporaryDirectory() as tmpdirname:
-            temp_repo_path = Path(tmpdirname) / "Flows"
+        repo_path = FLOWS_REPO_PATH
+        if (repo_path / '.git').is_dir():
+            logger.info(f"{FLOWMSG}: Updating Flows")
+            result = _run_git('-C', str(repo_path), 'fetch', '--depth', '1', 'origin')
+            if result.returncode != 0:
+                logger.warning(f"{FLOWMSG}: Failed to fetch flows repository, using cached copy:\n{result.stderr}")
+            else:
+                result = _run_git('-C', str(repo_path), 'reset', '--hard', 'FETCH_HEAD')
+                if result.returncode != 0:
+                    logger.warning(f"{FLOWMSG}: Failed to update cached flows repository, downloading again:\n{result.stderr}")
+                    shutil.rmtree(repo_path, onerror=remove_readonly)
+
+        if not (repo_path / '.git').is_dir():
+            if repo_path.exists():
+                shutil.rmtree(repo_path, onerror=remove_readonly)
             logger.info(f"{FLOWMSG}: Downloading Flows")
-
-            result = subprocess.run(['git', 'clone', FLOWS_DOWNLOAD_PATH, str(temp_repo_path)],
-                                    capture_output=True, text=True)
+            # gc.auto=0 only for the one-shot clone; later fetches into the cache keep normal auto gc
+            result = _run_git('-c', 'gc.auto=0', 'clone', '--depth', '1', '--single-branch', '--filter=blob:none',
+                              FLOWS_DOWNLOAD_PATH, str(repo_path))
             if result.returncode != 0:
                 logger.error(f"{FLOWMSG}: Failed to clone flows repository:\n{result.stderr}")
                 return
-            else:
-                pass
-            if not FLOWS_PATH.exists():
-                FLOWS_PATH.mkdir(parents=True)
-            for item in temp_repo_path.iterdir():
-                if item.name in ['.git', '.github']:
-                    continue
-                dest_item = FLOWS_PATH / item.name
-                if item.is_dir():
-                    if dest_item.exists():
-                        _copy_directory(item, dest_item)
-                    else:
-                        shutil.copytree(item, dest_item)
-                else:
-                    shutil.copy2(item, dest_item)
-            logger.info(f"{FLOWMSG}: Flows have been updated successfully.")
+
+        if not FLOWS_PATH.exists():
+            FLOWS_PATH.mkdir(parents=True)
+        _copy_directory(repo_path, FLOWS_PATH)
+        logger.info(f"{FLOWMSG}: Flows have been updated successfully.")
     except Exception as e:
         logger.error(f"{FLOWMSG}: An error occurred while downloading or updating flows: {e}")
 
+def _collect_copy_jobs(src: str, dest: str, jobs: List[Tuple[str, str]]) -> None:
+    with os.scandir(src) as it:
+        for entry in it:
+            if entry.name in _COPY_SKIP_NAMES:
+                continue
+            dest_item = os.path.join(dest, entry.name)
+            # Directory symlinks are followed and their contents copied, as copytree did
+            if entry.is_dir():
+                if entry.is_symlink() and os.path.realpath(entry.path) in _parent_dirs(src):
+                    logger.warning(f"{FLOWMSG}: Skipping symlink loop {entry.path}")
+                    continue
+                try:
+                    if not os.path.isdir(dest_item):
+                        os.mkdir(dest_item)
+                    _collect_copy_jobs(entry.path, dest_item, jobs)
+                except OSError as e:
+                    logger.warning(f"{FLOWMSG}: Failed to copy {entry.path}: {e}")
+            else:
+                # Unchanged files keep the mtime copied from the previous sync
+                try:
+                    src_st = entry.stat()
+                    dest_st = os.stat(dest_item)
+                    if (src_st.st_size, src_st.st_mtime_ns) == (dest_st.st_size, dest_st.st_mtime_ns):
+                        continue
+                except FileNotFoundError:
+                    pass
+                jobs.append((entry.path, dest_item))
+
+def _parent_dirs(path: str) -> Set[str]:
+    real = os.path.realpath(path)
+    parents = {real}
+    while True:
+        parent = os.path.dirname(real)
+        if parent == real:
+            return parents
+        parents.add(parent)
+        real = parent
+
 def _copy_directory(src: Path, dest: Path) -> None:
-    for item in src.iterdir():
-        if item.name in ['.git', '.github']:
-            continue
-        dest_item = dest / item.name
-        if item.is_dir():
-            if not dest_item.exists():
-                dest_item.mkdir()
-            _copy_directory(item, dest_item)
-        else:
-            shutil.copy2(item, dest_item)
+    jobs: List[Tuple[str, str]] = []
+    _collect_copy_jobs(str(src), str(dest), jobs)
+    if not jobs:
+        return
+    with ThreadPoolExecutor(max_workers=min(32, len(jobs))) as pool:
+        futures = [(src_file, pool.submit(shutil.copy2, src_file, dest_file)) for src_file, dest_file in jobs]
+        for src_file, future in futures:
+            try:
+                future.result()
+            except OSError as e:
+                # One unreadable entry shouldn't fail the whole flows update
+                logger.warning(f"{FLOWMSG}: Failed to copy {src_file}: {e}")
+
+def register_static_routes(app: web.Application) -> None:
+    if CORE_PATH.is_dir():
+        # Add the specific handlers before the general static route
+        app.router.add_get('/core/css/themes/list', list_themes_handler)
+        app.router.add_get('/core/css/themes/{filename}', get_theme_css_handler)
+        app.router.add_static('/core/', path=CORE_PATH, name='core')
 
-def setup_server() -> None:
     try:
-        server_instance = server.PromptServer.instance
+        app.router.add_get('/api/apps', apps_handler)
+        app.router.add_get('/api/extension-node-map', extension_node_map_handler)
+        app.router.add_post('/api/install-package', install_package_handler)
+        app.router.add_post('/api/update-package', update_package_handler)
+        app.router.add_post('/api/uninstall-package', uninstall_package_handler)
+        app.router.add_get('/api/flow-version', app_version_handler)
+        app.router.add_post('/api/save-config', save_config_handler)
+        app.router.add_post('/api/create-flow', create_flow_handler)
+
     except Exception as e:
-        logger.error(f"{FLOWMSG}: Failed to get server instance: {e}")
-        return
+        logger.error(f"{FLOWMSG}: Failed to add API routes: {e}")
 
     try:
-        download_or_update_flows()
+        app.router.add_get('/api/installed-custom-nodes', installed_custom_nodes_handler)
     except Exception as e:
-        logger.error(f"{FLOWMSG}: Failed to download or update flows: {e}")
+        logger.error(f"{FLOWMSG}: Failed to add installed custom nodes API route: {e}")
 
+async def _warm_flows(app: web.Application) -> None:
+    # Runs from on_startup, before the router is frozen, with git and disk work kept off the loop
+    loop = asyncio.get_running_loop()
     try:
-        AppManager.setup_app_routes(server_instance.app)
-    except Exception as e:
-        logger.error(f"{FLOWMSG}: Failed to set up app routes: {e}")
-    
+        try:
+            await loop.run_in_executor(None, _load_extension_node_map)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"{FLOWMSG}: Failed to preload extension-node-map.json: {e}")
+
+        try:
+            await loop.run_in_executor(None, download_or_update_flows)
+        except Exception as e:
+            logger.error(f"{FLOWMSG}: Failed to download or update flows: {e}")
+
+        try:
+            flows = await loop.run_in_executor(None, AppManager.scan_flows)
+            AppManager.setup_app_routes(app, flows)
+        except Exception as e:
+            logger.error(f"{FLOWMSG}: Failed to set up app routes: {e}")
+    finally:
+        _FLOWS_READY.set()
+
+def setup_server() -> None:
     try:
-        server_instance.app.router.add_get('/api/apps', apps_handler)
-        server_instance.app.router.add_get('/api/extension-node-map', extension_node_map_handler)
-        server_instance.app.router.add_post('/api/install-package', install_package_handler)
-        server_instance.app.router.add_post('/api/update-package', update_package_handler)
-        server_instance.app.router.add_post('/api/uninstall-package', uninstall_package_handler)        
-        server_instance.app.router.add_get('/api/flow-version', app_version_handler)
-        server_instance.app.router.add_post('/api/save-config', save_config_handler)
-        server_instance.app.router.add_post('/api/create-flow', create_flow_handler)
+        server_instance = server.PromptServer.instance
+    except Exception as e:
+        logger.error(f"{FLOWMSG}: Failed to get server instance: {e}")
+        return
 
+    _readahead(EXTENSION_NODE_MAP_PATH)
+
+    try:
+        register_static_routes(server_instance.app)
     except Exception as e:
-        logger.error(f"{FLOWMSG}: Failed to add API routes: {e}")
+        logger.error(f"{FLOWMSG}: Failed to add static routes: {e}")
 
     try:
-        server_instance.app.router.add_get('/api/installed-custom-nodes', installed_custom_nodes_handler)
+        server_instance.app.on_startup.append(_warm_flows)
     except Exception as e:
-        logger.error(f"{FLOWMSG}: Failed to add installed custom nodes API route: {e}")
+        logger.error(f"{FLOWMSG}: Failed to set up app routes: {e}")
 
 setup_server()
 